@@ -3,7 +3,8 @@ from tkinter import filedialog, messagebox, ttk
 import numpy as np
 import scipy.io.wavfile
 import os
-from src.utils import load_wav, calculate_snr, plot_signals
+from src.utils import calculate_snr, plot_signals, probe_wav
+from src.audio_cache import load_wav_cached
 from src.filters import apply_fir_filter
 from src.freq_filters import freq_filter
 from src.spectral import spectral_subtraction
@@ -192,11 +193,10 @@ class AudioDenoiserGUI:
                 file_size = os.path.getsize(filepath)
                 file_size_mb = file_size / (1024 * 1024)
                 
-                # Try to get audio info
+                # Try to get audio info from the header
                 try:
-                    fs, data = load_wav(filepath)
-                    duration = len(data) / fs
-                    info_text = f"✓ {os.path.basename(filepath)} | {file_size_mb:.1f} MB | {duration:.1f}s | {fs} Hz"
+                    info = probe_wav(filepath)
+                    info_text = f"✓ {os.path.basename(filepath)} | {file_size_mb:.1f} MB | {info['duration']:.1f}s | {info['sample_rate']} Hz"
                     self.file_info_label.config(text=info_text, foreground="green")
                 except:
                     info_text = f"✓ {os.path.basename(filepath)} | {file_size_mb:.1f} MB"
@@ -239,8 +239,8 @@ class AudioDenoiserGUI:
             self.progress_var.set(10)
             self.root.update()
             
-            # Load audio file
-            fs, noisy = load_wav(self.input_file_path.get())
+            # Load audio file (decoded once and shared with previews)
+            fs, noisy = load_wav_cached(self.input_file_path.get())
             length = len(noisy)
             chunk_size = 256
             
@@ -332,7 +332,7 @@ Denoised audio saved to: {output_path}
             
         try:
             # Load and process a small segment for preview
-            fs, noisy = load_wav(self.input_file_path.get())
+            fs, noisy = load_wav_cached(self.input_file_path.get())
             
             # Take first 2048 samples for preview
             preview_length = min(2048, len(noisy))
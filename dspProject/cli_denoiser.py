@@ -1,76 +1,426 @@
 import argparse
+import logging
 import numpy as np
+import pywt
 import scipy.io.wavfile
 import os
-from src.utils import load_wav, calculate_snr
-from src.filters import apply_fir_filter
-from src.freq_filters import freq_filter
-from src.spectral import spectral_subtraction
-from src.wavelet import wavelet_denoise
+import time
+from concurrent.futures import ThreadPoolExecutor
+from src.utils import load_wav_with_gain, calculate_snr
+from scipy.signal import lfilter
+from src.filters import fir_taps
+from src.freq_filters import freq_filter, freq_filter_from_spectrum
+from src.spectral import spectral_subtraction, spectral_subtraction_from_spectrum
+from src.wavelet import wavelet_denoise, wavelet_threshold, wavelet_margin
+from src.segments import plan_segments, process_segments
+from src.noise_profile import load_noise_profile, profile_magnitude
+from src.scheduler import build_ladder, RTFScheduler
 
-def denoise_audio(input_path, output_path, method="spectral", chunk_size=256):
+METHODS = ['spectral', 'wavelet', 'fir', 'freq']
+
+def parse_methods(spec):
     """
-    Denoise an audio file using the specified method.
+    Parse a method specification into a list of method names.
     
     Args:
-        input_path (str): Path to input audio file
-        output_path (str): Path to save denoised audio
+        spec (str): A single method, a comma-separated list, or 'all'
+    
+    Returns:
+        list: Method names in the order given (duplicates removed)
+    """
+    if spec == "all":
+        return list(METHODS)
+    methods = []
+    for name in spec.split(','):
+        name = name.strip()
+        if name not in METHODS:
+            raise ValueError(f"Unknown method '{name}' (choose from {', '.join(METHODS)} or 'all')")
+        if name not in methods:
+            methods.append(name)
+    return methods
+
+def chunk_grid(noisy, chunk_size=256):
+    """
+    Split a signal into its processing chunks without copying.
+    
+    Returns:
+        tuple: (2-D array with one full chunk per row, ragged final chunk)
+    """
+    n_full = len(noisy) // chunk_size
+    frames = noisy[:n_full * chunk_size].reshape(n_full, chunk_size)
+    return frames, noisy[n_full * chunk_size:]
+
+def chunk_spectra(noisy, chunk_size=256):
+    """
+    Compute the rfft of every processing chunk once so several methods can share it.
+    
+    Returns:
+        tuple: (2-D spectra of the full chunks, spectrum of the ragged final
+            chunk or None)
+    """
+    frames, tail = chunk_grid(noisy, chunk_size)
+    return np.fft.rfft(frames, axis=1), (np.fft.rfft(tail) if len(tail) else None)
+
+def _join_chunks(noisy, full, tail):
+    # Write the processed chunk grid and final chunk back into one signal
+    denoised = np.zeros_like(noisy)
+    n = full.size
+    denoised[:n] = full.reshape(-1)
+    if tail is not None:
+        denoised[n:] = tail
+    return denoised
+
+def apply_method(noisy, fs, method, chunk_size=256, spectra=None, noise_psd=None, noise_est=None):
+    """
+    Apply a single denoising method to an in-memory signal.
+    
+    The chunked methods (spectral, fir, freq) process every chunk
+    independently, so all full chunks are handled by one batched 2-D
+    transform or filter call, plus one call for the ragged final chunk.
+    
+    Args:
+        noisy (np.ndarray): Input signal
+        fs (int): Sample rate
         method (str): Denoising method ('spectral', 'wavelet', 'fir', 'freq')
         chunk_size (int): Chunk size for processing
+        spectra (tuple): Optional output of chunk_spectra(), reused by the
+            spectral and freq methods instead of transforming again
+        noise_psd (np.ndarray): Optional noise PSD built at FFT size
+            chunk_size (see src.noise_profile); replaces the per-file
+            estimate from the first 256 samples
+        noise_est (np.ndarray): Noise samples for the spectral method
+            (default: the first 256 samples of noisy)
     
     Returns:
-        dict: Processing results and statistics
+        np.ndarray: Denoised signal
     """
-    print(f"Loading audio file: {input_path}")
-    fs, noisy = load_wav(input_path)
-    length = len(noisy)
+    if method == "wavelet":
+        return wavelet_denoise(noisy)
     
-    print(f"Audio info: {length} samples, {fs} Hz, {length/fs:.2f} seconds")
-    print(f"Applying {method.upper()} denoising...")
+    if method == "fir":
+        taps = fir_taps(cutoff=[300, 3400], fs=fs, numtaps=101, pass_type='band')
+        frames, tail = chunk_grid(noisy, chunk_size)
+        full = lfilter(taps, 1.0, frames, axis=1) if len(frames) else frames
+        return _join_chunks(noisy, full, lfilter(taps, 1.0, tail) if len(tail) else None)
+    
+    if method not in ("spectral", "freq"):
+        raise ValueError(f"Unknown method '{method}'")
+    
+    if spectra is None:
+        spectra = chunk_spectra(noisy, chunk_size)
+    full_spec, tail_spec = spectra
+    tail_len = len(noisy) % chunk_size
     
-    # Apply selected denoising method
     if method == "spectral":
         # Estimate noise from first 256 samples
-        noise_est = noisy[:256]
-        denoised = np.zeros_like(noisy)
-        for i in range(0, length, chunk_size):
-            chunk = noisy[i:i+chunk_size]
-            denoised[i:i+chunk_size] = spectral_subtraction(chunk, noise_est, fs)
-            
-    elif method == "wavelet":
-        denoised = wavelet_denoise(noisy)
+        if noise_est is None:
+            noise_est = noisy[:256]
         
+        def noise_mag(n):
+            if noise_psd is None:
+                return np.abs(np.fft.rfft(noise_est, n=n))
+            return profile_magnitude(noise_psd, chunk_size, n)
+        
+        def process(S, n):
+            return spectral_subtraction_from_spectrum(S, noise_mag(n), n)
+    else:
+        def process(S, n):
+            return freq_filter_from_spectrum(S, fs, n, low=300, high=3400)
+    
+    full = process(full_spec, chunk_size)
+    tail = process(tail_spec, tail_len) if tail_spec is not None else None
+    return _join_chunks(noisy, full, tail)
+
+def process_block(chunk, fs, config, noise_est, noise_psd=None, taps=None,
+                  context=None, offset=0, threshold=None, n_fft=None):
+    """
+    Denoise one block using a scheduler configuration (see src.scheduler).
+    
+    Args:
+        chunk (np.ndarray): The block to denoise
+        fs (int): Sample rate
+        config (dict): Ladder configuration to use
+        noise_est (np.ndarray): Noise samples for the spectral method
+        noise_psd (np.ndarray): Optional noise PSD for the spectral method
+        taps (dict): Cache of FIR taps keyed by number of taps, filled on use
+        context (np.ndarray): For wavelet, the block with neighbouring
+            samples on each side; chunk starts at context[offset]
+        offset (int): Position of chunk within context
+        threshold (float): Wavelet threshold (e.g. from the whole signal)
+        n_fft (int): FFT size noise_psd was built for
+    """
+    method = config['method']
+    if method == "spectral":
+        if noise_psd is not None:
+            n = len(chunk)
+            noise_mag = profile_magnitude(noise_psd, n_fft, n)
+            return spectral_subtraction_from_spectrum(np.fft.rfft(chunk), noise_mag, n)
+        return spectral_subtraction(chunk, noise_est, fs)
+    elif method == "wavelet":
+        if context is None:
+            context, offset = chunk, 0
+        level = min(4, pywt.dwt_max_level(len(context), 'db8'))
+        denoised = wavelet_denoise(context, level=level, threshold=threshold)
+        return denoised[offset:offset+len(chunk)]
     elif method == "fir":
-        denoised = np.zeros_like(noisy)
-        for i in range(0, length, chunk_size):
-            chunk = noisy[i:i+chunk_size]
-            denoised[i:i+chunk_size] = apply_fir_filter(chunk, cutoff=[300, 3400], fs=fs, numtaps=101, pass_type='band')
-            
+        numtaps = config.get('numtaps', 101)
+        if taps is None:
+            taps = {}
+        if numtaps not in taps:
+            taps[numtaps] = fir_taps(cutoff=[300, 3400], fs=fs, numtaps=numtaps, pass_type='band')
+        return lfilter(taps[numtaps], 1.0, chunk)
     elif method == "freq":
-        denoised = np.zeros_like(noisy)
-        for i in range(0, length, chunk_size):
-            chunk = noisy[i:i+chunk_size]
-            denoised[i:i+chunk_size] = freq_filter(chunk, fs, low=300, high=3400)
+        return freq_filter(chunk, fs, low=300, high=3400)
+    raise ValueError(f"Unknown method '{method}'")
+
+def denoise_adaptive(noisy, fs, method="spectral", target_rtf=0.5, clock=time.perf_counter, noise_psd=None,
+                     chunk_size=256):
+    """
+    Denoise block by block under a real-time-factor budget.
     
-    # Save the denoised audio
-    print(f"Saving denoised audio to: {output_path}")
+    Blocks are processed in order as they would arrive live. An RTFScheduler
+    times each block against its duration and steps down to cheaper
+    configurations when processing falls behind, and back up once there is
+    headroom again.
+    
+    While the wavelet level is in use, the output matches wavelet_denoise()
+    on the whole file. Each block is transformed with wavelet_margin()
+    samples of context on each side (which costs extra work per block and
+    needs that much lookahead), and the threshold comes from the whole
+    signal rather than from each block.
+    
+    Args:
+        noisy (np.ndarray): Input signal
+        fs (int): Sample rate
+        method (str): Preferred (most expensive) denoising method
+        target_rtf (float): Target real-time factor
+        clock (callable): Time source, replaceable by a simulated clock
+        noise_psd (np.ndarray): Optional noise PSD for the spectral method,
+            built at FFT size chunk_size
+        chunk_size (int): Block size of the first ladder levels; cheaper
+            levels use multiples of it
+    
+    Returns:
+        tuple: (denoised signal, RTFScheduler with the switch history)
+    """
+    ladder = build_ladder(method, chunk_size)
+    scheduler = RTFScheduler(ladder, fs, target_rtf=target_rtf, clock=clock)
+    # Estimate noise from first 256 samples
+    noise_est = noisy[:256]
+    taps = {}
+    threshold = None
+    if any(level['method'] == "wavelet" for level in ladder):
+        threshold = wavelet_threshold(noisy)
+    # Align the wavelet context to the decomposition so coefficients line
+    # up with those of the whole-signal transform
+    align = 2 ** 4
+    margin = wavelet_margin(level=4)
+    denoised = np.zeros_like(noisy)
+    i = 0
+    while i < len(noisy):
+        chunk = noisy[i:i+scheduler.current['chunk_size']]
+        pad_start = max(i - margin, 0) // align * align
+        pad_stop = min(-(-(i + len(chunk) + margin) // align) * align, len(noisy))
+        
+        def process(config):
+            return process_block(chunk, fs, config, noise_est, noise_psd, taps,
+                                 context=noisy[pad_start:pad_stop], offset=i - pad_start,
+                                 threshold=threshold, n_fft=chunk_size)
+        
+        denoised[i:i+len(chunk)] = scheduler.run(process, len(chunk))
+        i += len(chunk)
+    return denoised, scheduler
+
+def _denoise_segment(segment, fs, method, chunk_size, noise_psd, noise_est, threshold):
+    # Module-level so it can be sent to worker processes
+    if method == "wavelet":
+        return wavelet_denoise(segment, threshold=threshold)
+    return apply_method(segment, fs, method, chunk_size, noise_psd=noise_psd, noise_est=noise_est)
+
+def denoise_parallel(noisy, fs, method="spectral", chunk_size=256, workers=None,
+                     use_processes=True, noise_psd=None, min_segment=1 << 16):
+    """
+    Denoise one long signal by splitting it into segments processed in parallel.
+    
+    The result matches apply_method() on the whole signal. The chunked methods
+    (spectral, fir, freq) treat every chunk independently, so segment
+    boundaries are placed on the chunk grid and need no overlap. Wavelet
+    denoising uses the threshold from the whole signal, boundaries aligned to
+    the decomposition level, and an overlap covering the wavelet support.
+    
+    Args:
+        noisy (np.ndarray): Input signal
+        fs (int): Sample rate
+        method (str): Denoising method ('spectral', 'wavelet', 'fir', 'freq')
+        chunk_size (int): Chunk size for processing
+        workers (int): Number of parallel workers (default: number of CPUs)
+        use_processes (bool): Run segments in worker processes over shared
+            memory (the default) rather than threads. Threads only overlap
+            where numpy/scipy/pywt release the GIL.
+        noise_psd (np.ndarray): Optional noise PSD (see apply_method)
+        min_segment (int): Minimum segment length in samples
+    
+    Returns:
+        np.ndarray: Denoised signal
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    threshold = None
+    out_dtype = noisy.dtype
+    if method == "wavelet":
+        level = 4
+        threshold = wavelet_threshold(noisy)
+        out_dtype = np.float64
+        segments = plan_segments(len(noisy), workers, align=2 ** level,
+                                 margin=wavelet_margin(level=level), min_length=min_segment)
+    else:
+        segments = plan_segments(len(noisy), workers, align=chunk_size, min_length=min_segment)
+    
+    args = (fs, method, chunk_size, noise_psd, noisy[:256].copy(), threshold)
+    if len(segments) == 1:
+        return _denoise_segment(noisy, *args)
+    return process_segments(noisy, _denoise_segment, segments, args, workers, use_processes, out_dtype)
+
+def save_denoised(output_path, fs, denoised):
+    """Write a denoised signal as peak-normalized 16-bit PCM."""
     final_int16 = np.int16(denoised / np.max(np.abs(denoised)) * 32767)
     scipy.io.wavfile.write(output_path, fs, final_int16)
-    
-    # Calculate statistics
+
+def _make_results(input_path, output_path, method, fs, noisy, denoised):
     snr_noisy = calculate_snr(noisy, noisy)  # This will be 0 dB
     snr_denoised = calculate_snr(noisy, denoised)
     
-    results = {
+    return {
         'input_file': input_path,
         'output_file': output_path,
         'method': method,
         'sample_rate': fs,
-        'duration': length/fs,
+        'duration': len(noisy)/fs,
         'snr_noisy': snr_noisy,
         'snr_denoised': snr_denoised,
         'snr_improvement': snr_denoised - snr_noisy
     }
+
+def denoise_audio(input_path, output_path, method="spectral", chunk_size=256, target_rtf=None,
+                  noise_profile=None, workers=None, use_processes=True):
+    """
+    Denoise an audio file using the specified method.
+    
+    Args:
+        input_path (str): Path to input audio file
+        output_path (str): Path to save denoised audio
+        method (str): Denoising method ('spectral', 'wavelet', 'fir', 'freq')
+        chunk_size (int): Chunk size for processing
+        target_rtf (float): If set, process block by block and degrade to
+            cheaper configurations to stay under this real-time factor
+        noise_profile (str): Optional noise profile library (.npz) to use
+            instead of estimating noise from the start of the file
+        workers (int): If set, split the file into segments processed by
+            this many parallel workers (see denoise_parallel)
+        use_processes (bool): With workers, use worker processes (default)
+            instead of threads
+    
+    Returns:
+        dict: Processing results and statistics
+    """
+    print(f"Loading audio file: {input_path}")
+    fs, noisy, gain = load_wav_with_gain(input_path)
+    length = len(noisy)
+    
+    print(f"Audio info: {length} samples, {fs} Hz, {length/fs:.2f} seconds")
+    print(f"Applying {method.upper()} denoising...")
+    
+    # Only spectral subtraction uses the profile; the adaptive ladder for
+    # wavelet can step down to it
+    uses_profile = method == "spectral"
+    if target_rtf is not None:
+        uses_profile = any(level['method'] == "spectral" for level in build_ladder(method, chunk_size))
+    noise_psd = None
+    if noise_profile is not None and uses_profile:
+        noise_psd = load_noise_profile(noise_profile, fs, chunk_size, gain)
+    
+    # Apply selected denoising method
+    scheduler = None
+    if target_rtf is not None and workers is not None:
+        raise ValueError("target_rtf and workers cannot be combined")
+    if workers is not None:
+        denoised = denoise_parallel(noisy, fs, method, chunk_size, workers, use_processes, noise_psd)
+    elif target_rtf is None:
+        denoised = apply_method(noisy, fs, method, chunk_size, noise_psd=noise_psd)
+    else:
+        denoised, scheduler = denoise_adaptive(noisy, fs, method, target_rtf, noise_psd=noise_psd,
+                                              chunk_size=chunk_size)
+    
+    # Save the denoised audio
+    print(f"Saving denoised audio to: {output_path}")
+    save_denoised(output_path, fs, denoised)
+    
+    # Calculate statistics
+    results = _make_results(input_path, output_path, method, fs, noisy, denoised)
+    if scheduler is not None:
+        results['rtf_switches'] = scheduler.switches
+    return results
+
+def denoise_audio_multi(input_path, output_paths, chunk_size=256, noise_profile=None):
+    """
+    Denoise an audio file with several methods from a single decode.
+    
+    The file is loaded once and the per-chunk spectra are computed once and
+    shared by the spectral and freq methods. The methods then run
+    concurrently on the same in-memory buffer. Each method is a few large
+    batched numpy/scipy/pywt calls that release the GIL, so with a free core
+    per method the total time approaches that of the slowest method.
+    
+    Args:
+        input_path (str): Path to input audio file
+        output_paths (dict): Maps each method name to its output path
+        chunk_size (int): Chunk size for processing
+        noise_profile (str): Optional noise profile library (.npz)
+    
+    Returns:
+        dict: Maps each method name to its results dict, or to an
+            exception if that method failed
+    """
+    print(f"Loading audio file: {input_path}")
+    fs, noisy, gain = load_wav_with_gain(input_path)
+    length = len(noisy)
+    
+    print(f"Audio info: {length} samples, {fs} Hz, {length/fs:.2f} seconds")
+    print(f"Applying {', '.join(m.upper() for m in output_paths)} denoising...")
+    
+    noise_psd = None
+    if noise_profile is not None and "spectral" in output_paths:
+        try:
+            noise_psd = load_noise_profile(noise_profile, fs, chunk_size, gain)
+        except Exception as e:
+            # Fail only the method that needs the profile
+            noise_psd = e
+    
+    spectra = None
+    if any(m in ("spectral", "freq") for m in output_paths):
+        spectra = chunk_spectra(noisy, chunk_size)
+    
+    def run(method):
+        if method == "spectral" and isinstance(noise_psd, Exception):
+            raise noise_psd
+        start = time.perf_counter()
+        denoised = apply_method(noisy, fs, method, chunk_size, spectra=spectra,
+                                noise_psd=noise_psd if method == "spectral" else None)
+        save_denoised(output_paths[method], fs, denoised)
+        result = _make_results(input_path, output_paths[method], method, fs, noisy, denoised)
+        result['elapsed'] = time.perf_counter() - start
+        return result
+    
+    results = {}
+    with ThreadPoolExecutor(max_workers=len(output_paths)) as executor:
+        futures = {method: executor.submit(run, method) for method in output_paths}
+        for method, future in futures.items():
+            try:
+                results[method] = future.result()
+            except Exception as e:
+                results[method] = e
     
     return results
 
@@ -118,19 +468,46 @@ def main():
     parser.add_argument('input', nargs='?', help='Input audio file path (or use --explorer to select)')
     parser.add_argument('output', nargs='?', help='Output audio file path (or use --explorer to select)')
     parser.add_argument('--method', '-m', 
-                       choices=['spectral', 'wavelet', 'fir', 'freq'],
+                       choices=METHODS,
                        default='spectral',
                        help='Denoising method to use (default: spectral)')
     parser.add_argument('--chunk-size', '-c',
                        type=int,
                        default=256,
                        help='Chunk size for processing (default: 256)')
+    parser.add_argument('--target-rtf',
+                       type=float,
+                       default=None,
+                       help='Process block by block and step down to cheaper settings to stay '
+                            'under this real-time factor (e.g. 0.5)')
+    parser.add_argument('--noise-profile',
+                       default=None,
+                       help='Noise profile library (.npz) from noise_profile_builder.py, '
+                            'used instead of per-file noise estimation')
+    parser.add_argument('--workers', '-j',
+                       type=int,
+                       default=None,
+                       help='Split the file into segments processed in parallel by this many workers')
+    parser.add_argument('--pool',
+                       choices=['process', 'thread'],
+                       default=None,
+                       help='With --workers, run segments in worker processes (default) or threads')
     parser.add_argument('--explorer', '-e',
                        action='store_true',
                        help='Use file explorer to select input and output files')
     
     args = parser.parse_args()
     
+    if args.target_rtf is not None and args.workers is not None:
+        parser.error("--target-rtf and --workers cannot be combined")
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.pool is not None and args.workers is None:
+        parser.error("--pool requires --workers")
+    
+    if args.target_rtf is not None:
+        logging.basicConfig(level=logging.INFO, format='%(message)s')
+    
     # Handle file selection
     input_path = args.input
     output_path = args.output
@@ -167,7 +544,8 @@ def main():
         os.makedirs(output_dir)
     
     try:
-        results = denoise_audio(input_path, output_path, args.method, args.chunk_size)
+        results = denoise_audio(input_path, output_path, args.method, args.chunk_size, args.target_rtf,
+                                args.noise_profile, args.workers, args.pool != 'thread')
         
         print("\n" + "="*50)
         print("PROCESSING COMPLETE")
@@ -180,6 +558,8 @@ def main():
         print(f"Input SNR: {results['snr_noisy']:.2f} dB")
         print(f"Denoised SNR: {results['snr_denoised']:.2f} dB")
         print(f"SNR improvement: {results['snr_improvement']:.2f} dB")
+        if 'rtf_switches' in results:
+            print(f"RTF switches: {len(results['rtf_switches'])}")
         print("="*50)
         
     except Exception as e:
@@ -0,0 +1,52 @@
+import os
+import glob
+import argparse
+from src.noise_profile import build_noise_profile, save_noise_profile
+
+def main():
+    parser = argparse.ArgumentParser(description='Build a reusable noise profile (.npz)')
+    parser.add_argument('output', help='Noise profile library to create or update (.npz)')
+    parser.add_argument('inputs', nargs='+',
+                       help='Audio files or directories sharing the same noise condition')
+    parser.add_argument('--n-fft', '-n',
+                       type=int,
+                       default=256,
+                       help='FFT size, must match the chunk size used for denoising (default: 256)')
+    parser.add_argument('--noise-only',
+                       action='store_true',
+                       help='Inputs are noise-only recordings: use every frame')
+    parser.add_argument('--quantile', '-q',
+                       type=float,
+                       default=0.1,
+                       help='Fraction of quietest frames used per file when not noise-only (default: 0.1)')
+    parser.add_argument('--pattern', '-p',
+                       default='*.wav',
+                       help='File pattern to match in input directories (default: *.wav)')
+
+    args = parser.parse_args()
+
+    # Expand directories into their matching files
+    paths = []
+    for path in args.inputs:
+        if os.path.isdir(path):
+            paths.extend(sorted(glob.glob(os.path.join(path, args.pattern))))
+        elif os.path.exists(path):
+            paths.append(path)
+        else:
+            print(f"Error: Input '{path}' does not exist")
+            return
+
+    if not paths:
+        print("No input files found")
+        return
+
+    try:
+        print(f"Estimating noise from {len(paths)} files (FFT size {args.n_fft})...")
+        fs, psd = build_noise_profile(paths, args.n_fft, args.noise_only, args.quantile)
+        output = save_noise_profile(args.output, fs, args.n_fft, psd)
+        print(f"Saved noise profile for {fs} Hz / FFT size {args.n_fft} to: {output}")
+    except Exception as e:
+        print(f"Error: {str(e)}")
+
+if __name__ == "__main__":
+    main()
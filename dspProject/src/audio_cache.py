@@ -0,0 +1,73 @@
+import os
+import threading
+from collections import OrderedDict
+from src.utils import load_wav
+
+
+class AudioCache:
+    """
+    Size-bounded LRU cache of decoded audio.
+
+    Entries are keyed by absolute path, modification time and file size, so
+    an edited file is decoded again. The least recently used entries are
+    evicted once the decoded data exceeds max_bytes. Cached arrays are
+    read-only because every caller shares the same buffer.
+
+    Args:
+        max_bytes (int): Upper bound on the total size of cached samples
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, filename):
+        """Return (fs, data) like load_wav, decoding only on a cache miss."""
+        path = os.path.abspath(filename)
+        stat = os.stat(path)
+        key = (path, stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        # Decode outside the lock so other files can be served meanwhile
+        fs, data = load_wav(path)
+        data.setflags(write=False)
+        entry = (fs, data)
+
+        with self._lock:
+            # Drop stale versions of the same file
+            for old_key in [k for k in self._entries if k[0] == path and k != key]:
+                self._discard(old_key)
+            if key not in self._entries and data.nbytes <= self.max_bytes:
+                self._entries[key] = entry
+                self.total_bytes += data.nbytes
+                while self.total_bytes > self.max_bytes:
+                    self._discard(next(iter(self._entries)))
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def _discard(self, key):
+        _, data = self._entries.pop(key)
+        self.total_bytes -= data.nbytes
+
+
+# Shared by the GUI and any other long-lived caller in this process
+default_cache = AudioCache()
+
+
+def load_wav_cached(filename):
+    """load_wav through the shared process-wide cache."""
+    return default_cache.load(filename)
@@ -2,12 +2,19 @@ import numpy as np
 
 def freq_filter(signal, fs, low=None, high=None):
     N = len(signal)
-    freqs = np.fft.rfftfreq(N, 1/fs)
     spectrum = np.fft.rfft(signal)
-    mask = np.ones_like(spectrum, dtype=bool)
+    return freq_filter_from_spectrum(spectrum, fs, N, low=low, high=high)
+
+def freq_mask(n, fs, low=None, high=None):
+    freqs = np.fft.rfftfreq(n, 1/fs)
+    mask = np.ones(len(freqs), dtype=bool)
     if low is not None:
         mask &= freqs >= low
     if high is not None:
         mask &= freqs <= high
-    filtered_spectrum = spectrum * mask
-    return np.fft.irfft(filtered_spectrum, n=N) 
\ No newline at end of file
+    return mask
+
+def freq_filter_from_spectrum(spectrum, fs, n, low=None, high=None):
+    # Apply the band mask to an existing rfft spectrum of an n-sample signal
+    filtered_spectrum = spectrum * freq_mask(n, fs, low=low, high=high)
+    return np.fft.irfft(filtered_spectrum, n=n)
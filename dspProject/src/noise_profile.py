@@ -0,0 +1,162 @@
+import os
+import numpy as np
+from src.utils import load_wav_with_gain
+
+# Parsed profiles, keyed by (path, mtime, size) so an updated file is re-read
+_cache = {}
+
+
+def profile_path(path):
+    """Profile library path with the .npz extension np.savez would add."""
+    return path if path.endswith('.npz') else path + '.npz'
+
+
+def _profile_key(fs, n_fft):
+    return f"psd_{int(fs)}_{int(n_fft)}"
+
+
+def frame_psd(signal, n_fft=256):
+    """Power spectrum |rfft|^2 of each non-overlapping n_fft frame, one row per frame."""
+    n_frames = len(signal) // n_fft
+    if n_frames == 0:
+        # Too short for a full frame: zero-pad a single frame
+        return np.abs(np.fft.rfft(signal, n=n_fft))[np.newaxis, :] ** 2
+    frames = np.reshape(signal[:n_frames * n_fft], (n_frames, n_fft))
+    return np.abs(np.fft.rfft(frames, axis=1)) ** 2
+
+
+def _quietest_frames(psd, quantile):
+    """Keep the given fraction of lowest-energy frames (at least one)."""
+    if len(psd) <= 1:
+        return psd
+    energy = psd.sum(axis=1)
+    keep = max(1, int(np.ceil(len(psd) * quantile)))
+    return psd[np.argsort(energy)[:keep]]
+
+
+def estimate_noise_psd(signal, n_fft=256, quantile=None):
+    """
+    Estimate the noise power spectrum of a signal.
+
+    Args:
+        signal (np.ndarray): Input signal
+        n_fft (int): Frame/FFT size
+        quantile (float): If set, average only this fraction of the
+            lowest-energy frames, so speech frames are left out. If None,
+            all frames are averaged (for noise-only recordings).
+
+    Returns:
+        np.ndarray: Mean power per rfft bin, length n_fft // 2 + 1
+    """
+    psd = frame_psd(signal, n_fft)
+    if quantile is not None:
+        psd = _quietest_frames(psd, quantile)
+    return psd.mean(axis=0)
+
+
+def build_noise_profile(paths, n_fft=256, noise_only=False, quantile=0.1):
+    """
+    Estimate one noise PSD from several files.
+
+    The PSD is measured on samples at the full scale of their sample type
+    rather than peak-normalized, so it reflects the actual noise level and
+    not each file's loudness. load_noise_profile() rescales it to a
+    normalized target file.
+
+    Args:
+        paths (list): Audio files sharing the same noise condition
+        n_fft (int): Frame/FFT size the profile is built for
+        noise_only (bool): Treat the files as noise-only recordings and use
+            every frame, instead of only the quietest frames of each file
+        quantile (float): Fraction of quietest frames used per file when
+            noise_only is False
+
+    Returns:
+        tuple: (sample rate, PSD as float32 array); the per-file estimates
+            are averaged with equal weight
+    """
+    if not paths:
+        raise ValueError("No input files given")
+    fs = None
+    estimates = []
+    for path in paths:
+        file_fs, data, gain = load_wav_with_gain(path)
+        if fs is None:
+            fs = file_fs
+        elif file_fs != fs:
+            raise ValueError(f"Sample rate mismatch: {path} is {file_fs} Hz, expected {fs} Hz")
+        estimates.append(estimate_noise_psd(data / gain, n_fft, None if noise_only else quantile))
+    return fs, np.mean(estimates, axis=0).astype(np.float32)
+
+
+def save_noise_profile(path, fs, n_fft, psd):
+    """
+    Save a noise PSD into a profile library (.npz), keyed by sample rate and
+    FFT size. Profiles already in the file for other keys are kept.
+
+    Returns:
+        str: Path written, with the .npz extension added if missing
+    """
+    path = profile_path(path)
+    profiles = {}
+    if os.path.exists(path):
+        with np.load(path) as existing:
+            profiles = {key: existing[key] for key in existing.files}
+    profiles[_profile_key(fs, n_fft)] = np.asarray(psd, dtype=np.float32)
+    np.savez(path, **profiles)
+    _cache.pop(os.path.abspath(path), None)
+    return path
+
+
+def load_noise_profile(path, fs, n_fft, gain=1.0):
+    """
+    Load the noise PSD for a sample rate and FFT size from a profile library.
+
+    Loaded libraries are cached in process, so repeated calls from many files
+    or worker threads read the file once.
+
+    Args:
+        path (str): Profile library (.npz)
+        fs (int): Sample rate
+        n_fft (int): FFT size
+        gain (float): Normalization gain of the target file (from
+            load_wav_with_gain); the stored full-scale PSD is scaled by
+            gain ** 2 to match the normalized samples
+
+    Returns:
+        np.ndarray: PSD of length n_fft // 2 + 1 (read-only)
+    """
+    path = profile_path(path)
+    abspath = os.path.abspath(path)
+    stat = os.stat(abspath)
+    entry = _cache.get(abspath)
+    if entry is None or entry[0] != (stat.st_mtime_ns, stat.st_size):
+        with np.load(abspath) as library:
+            profiles = {key: library[key] for key in library.files}
+        for psd in profiles.values():
+            psd.setflags(write=False)
+        entry = ((stat.st_mtime_ns, stat.st_size), profiles)
+        _cache[abspath] = entry
+    profiles = entry[1]
+    key = _profile_key(fs, n_fft)
+    if key not in profiles:
+        available = ', '.join(sorted(profiles)) or 'none'
+        raise ValueError(f"No noise profile for {fs} Hz / FFT size {n_fft} in {path} (available: {available})")
+    if gain == 1.0:
+        return profiles[key]
+    psd = profiles[key] * np.float32(gain ** 2)
+    psd.setflags(write=False)
+    return psd
+
+
+def profile_magnitude(psd, n_fft, n):
+    """
+    Noise magnitude spectrum for an n-sample frame from a PSD built at n_fft.
+
+    For n != n_fft (e.g. a short final chunk) the PSD is interpolated onto
+    the n-point frequency grid and rescaled for the frame length.
+    """
+    if n == n_fft:
+        return np.sqrt(psd)
+    psd_n = np.interp(np.fft.rfftfreq(n), np.fft.rfftfreq(n_fft), psd)
+    return np.sqrt(psd_n * n / n_fft)
@@ -0,0 +1,210 @@
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Processing configurations ordered from most to least expensive, starting
+# at each method. 'hop' scales the base chunk size; larger blocks mean fewer
+# transforms/filter calls per second of audio.
+LADDERS = {
+    'wavelet': [
+        {'method': 'wavelet', 'hop': 1},
+        {'method': 'spectral', 'hop': 1},
+        {'method': 'freq', 'hop': 1},
+        {'method': 'freq', 'hop': 4},
+    ],
+    'spectral': [
+        {'method': 'spectral', 'hop': 1},
+        {'method': 'freq', 'hop': 1},
+        {'method': 'freq', 'hop': 4},
+    ],
+    'fir': [
+        {'method': 'fir', 'hop': 1, 'numtaps': 101},
+        {'method': 'fir', 'hop': 1, 'numtaps': 51},
+        {'method': 'fir', 'hop': 1, 'numtaps': 25},
+        {'method': 'fir', 'hop': 4, 'numtaps': 25},
+    ],
+    'freq': [
+        {'method': 'freq', 'hop': 1},
+        {'method': 'freq', 'hop': 4},
+    ],
+}
+
+
+def build_ladder(method, chunk_size=256):
+    """Ladder for a method with block sizes scaled from the base chunk size."""
+    ladder = []
+    for level in LADDERS[method]:
+        config = {key: value for key, value in level.items() if key != 'hop'}
+        config['chunk_size'] = chunk_size * level['hop']
+        ladder.append(config)
+    return ladder
+
+
+def describe_level(config):
+    """Short human-readable label for a ladder configuration."""
+    text = f"{config['method']}/{config['chunk_size']}"
+    if 'numtaps' in config:
+        text += f"/{config['numtaps']}taps"
+    return text
+
+
+class RTFScheduler:
+    """
+    Keep block processing within a real-time-factor budget.
+
+    The real-time factor (RTF) of a block is its processing time divided by
+    its duration. The scheduler tracks a smoothed RTF and steps down the
+    ladder to a cheaper configuration when it stays above the target.
+
+    Stepping back up is guarded against oscillation. When the scheduler
+    leaves a level, it records how much more that level cost than the next
+    one. It only steps up once the current RTF scaled by that ratio fits the
+    target, e.g. when the load has dropped. If a step-up still fails, the
+    patience for retrying that level doubles.
+
+    Args:
+        levels (list): Configurations ordered from most to least expensive
+        fs (int): Sample rate, used to turn block sizes into durations
+        target_rtf (float): RTF to stay under (1.0 means just keeping up)
+        headroom (float): Consider stepping up once the RTF is below
+            target * headroom
+        patience (int): Consecutive blocks past a threshold before switching
+        smoothing (float): Weight of the newest block in the moving average
+        clock (callable): Returns the current time in seconds; pass a
+            simulated clock to drive the scheduler deterministically
+
+    Example, with a simulated clock where each method costs a fixed RTF
+    (run with ``python -m doctest src/scheduler.py``):
+
+    >>> now = [0.0]
+    >>> costs = {'wavelet': 1.25, 'spectral': 0.1, 'freq': 0.05}
+    >>> def process(config):
+    ...     now[0] += costs[config['method']] * config['chunk_size'] / 8000
+    >>> scheduler = RTFScheduler(build_ladder('wavelet'), 8000, target_rtf=0.5,
+    ...                          clock=lambda: now[0])
+    >>> for _ in range(60):
+    ...     scheduler.run(process, scheduler.current['chunk_size'])
+    >>> [(s['block'], describe_level(s['to'])) for s in scheduler.switches]
+    [(3, 'spectral/256')]
+
+    Wavelet was measured at 12.5x the cost of spectral, so it is not retried
+    while spectral runs at 0.1. Once the load drops far enough for wavelet
+    to fit, the scheduler steps back up:
+
+    >>> costs = {'wavelet': 0.2, 'spectral': 0.016, 'freq': 0.008}
+    >>> for _ in range(60):
+    ...     scheduler.run(process, scheduler.current['chunk_size'])
+    >>> [(s['block'], describe_level(s['to'])) for s in scheduler.switches]
+    [(3, 'spectral/256'), (64, 'wavelet/256')]
+    >>> scheduler.current['method']
+    'wavelet'
+    """
+
+    def __init__(self, levels, fs, target_rtf=0.5, headroom=0.5, patience=3,
+                 smoothing=0.3, clock=time.perf_counter):
+        if not levels:
+            raise ValueError("levels must not be empty")
+        self.levels = levels
+        self.fs = fs
+        self.target_rtf = target_rtf
+        self.headroom = headroom
+        self.patience = patience
+        self.smoothing = smoothing
+        self.clock = clock
+        self.index = 0
+        self.rtf = None
+        self.blocks = 0
+        self.switches = []
+        self._over = 0
+        self._under = 0
+        # cost_ratio[i]: RTF of level i relative to level i + 1, measured
+        # when stepping down from i
+        self.cost_ratio = {}
+        self._up_patience = [patience] * len(levels)
+        self._left_rtf = None
+        self._stepped_up = False
+
+    @property
+    def current(self):
+        """The configuration to use for the next block."""
+        return self.levels[self.index]
+
+    def run(self, process, n_samples):
+        """
+        Time process(config) on the current configuration and record it.
+
+        Args:
+            process (callable): Processes one block given a configuration
+            n_samples (int): Number of samples in the block
+
+        Returns:
+            Whatever process returns
+        """
+        start = self.clock()
+        result = process(self.current)
+        self.record(self.clock() - start, n_samples)
+        return result
+
+    def predicted_rtf(self, index):
+        """Estimated RTF of a more expensive level at the current load, or None."""
+        rtf = self.rtf
+        for i in range(self.index - 1, index - 1, -1):
+            if i not in self.cost_ratio:
+                return None
+            rtf *= self.cost_ratio[i]
+        return rtf
+
+    def record(self, elapsed, n_samples):
+        """Record the processing time of one block and adapt if needed."""
+        self.blocks += 1
+        block_rtf = elapsed / (n_samples / self.fs)
+        if self.rtf is None:
+            self.rtf = block_rtf
+            if self._left_rtf is not None and block_rtf > 0:
+                # First block after stepping down: compare the two levels
+                self.cost_ratio[self.index - 1] = self._left_rtf / block_rtf
+                self._left_rtf = None
+        else:
+            self.rtf = self.smoothing * block_rtf + (1 - self.smoothing) * self.rtf
+
+        if self.rtf > self.target_rtf:
+            self._over += 1
+            self._under = 0
+        elif self.rtf < self.target_rtf * self.headroom:
+            self._under += 1
+            self._over = 0
+        else:
+            self._over = 0
+            self._under = 0
+
+        if self._over >= self.patience and self.index < len(self.levels) - 1:
+            if self._stepped_up:
+                # The last step-up didn't hold: wait longer before retrying
+                self._up_patience[self.index] *= 2
+            self._left_rtf = self.rtf
+            self._switch(self.index + 1)
+        elif self.index > 0 and self._under >= self._up_patience[self.index - 1]:
+            predicted = self.predicted_rtf(self.index - 1)
+            if predicted is None or predicted <= self.target_rtf:
+                self._switch(self.index - 1)
+                self._stepped_up = True
+
+    def _switch(self, index):
+        old, new = self.current, self.levels[index]
+        direction = "down" if index > self.index else "up"
+        logger.info("Block %d: RTF %.3f (target %.3f), stepping %s from %s to %s",
+                    self.blocks, self.rtf, self.target_rtf, direction,
+                    describe_level(old), describe_level(new))
+        self.switches.append({
+            'block': self.blocks,
+            'rtf': self.rtf,
+            'from': old,
+            'to': new,
+        })
+        self.index = index
+        # Measure the new configuration from scratch
+        self.rtf = None
+        self._over = 0
+        self._under = 0
+        self._stepped_up = False
@@ -0,0 +1,106 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+
+
+def plan_segments(length, n_segments, align=1, margin=0, min_length=1):
+    """
+    Split [0, length) into contiguous segments for parallel processing.
+
+    Args:
+        length (int): Signal length in samples
+        n_segments (int): Desired number of segments
+        align (int): Segment boundaries are multiples of this
+        margin (int): Extra context on each side of a segment, clipped to
+            the signal; it is processed but discarded when stitching
+        min_length (int): Don't make segments shorter than this
+
+    Returns:
+        list: (start, stop, pad_start, pad_stop) tuples. Samples
+            [start, stop) are kept from processing [pad_start, pad_stop).
+    """
+    seg_len = max(-(-length // max(n_segments, 1)), min_length, 1)
+    seg_len = -(-seg_len // align) * align
+    segments = []
+    for start in range(0, length, seg_len):
+        stop = min(start + seg_len, length)
+        segments.append((start, stop, max(start - margin, 0), min(stop + margin, length)))
+    return segments
+
+
+def _stitch(x, out, segment, func, args):
+    start, stop, pad_start, pad_stop = segment
+    y = func(x[pad_start:pad_stop], *args)
+    out[start:stop] = y[start - pad_start:stop - pad_start]
+
+
+def _shared_task(in_name, out_name, length, dtype, out_dtype, segment, func, args):
+    # Runs in a worker process: attach to the parent's buffers by name
+    shm_in = shared_memory.SharedMemory(name=in_name)
+    shm_out = shared_memory.SharedMemory(name=out_name)
+    try:
+        x = np.ndarray((length,), dtype=dtype, buffer=shm_in.buf)
+        out = np.ndarray((length,), dtype=out_dtype, buffer=shm_out.buf)
+        _stitch(x, out, segment, func, args)
+        del x, out
+    finally:
+        shm_in.close()
+        shm_out.close()
+
+
+def process_segments(signal, func, segments, args=(), workers=None, use_processes=True,
+                     out_dtype=None):
+    """
+    Apply func to each segment of signal in parallel and stitch the results.
+
+    Each segment is processed with its margins and only its own
+    [start, stop) range is written to the output, so the result matches
+    processing the whole signal when the margins cover func's context.
+
+    Args:
+        signal (np.ndarray): 1-D input signal
+        func (callable): func(segment, *args) -> processed segment of the
+            same length; must be a module-level function for processes
+        segments (list): Output of plan_segments()
+        args (tuple): Extra arguments for func
+        workers (int): Pool size (default: number of CPUs)
+        use_processes (bool): Use a process pool over shared memory (the
+            default). With False, use threads, which only overlap while
+            func runs code that releases the GIL.
+        out_dtype: dtype of the output (default: that of signal)
+
+    Returns:
+        np.ndarray: Stitched output
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    signal = np.ascontiguousarray(signal)
+    out_dtype = np.dtype(out_dtype or signal.dtype)
+
+    if not use_processes:
+        out = np.empty(signal.shape, dtype=out_dtype)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_stitch, signal, out, seg, func, args) for seg in segments]
+            for future in futures:
+                future.result()
+        return out
+
+    shm_in = shared_memory.SharedMemory(create=True, size=max(signal.nbytes, 1))
+    shm_out = shared_memory.SharedMemory(create=True, size=max(len(signal) * out_dtype.itemsize, 1))
+    try:
+        x = np.ndarray(signal.shape, dtype=signal.dtype, buffer=shm_in.buf)
+        x[:] = signal
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_shared_task, shm_in.name, shm_out.name, len(signal),
+                                       signal.dtype.str, out_dtype.str, seg, func, args)
+                       for seg in segments]
+            for future in futures:
+                future.result()
+        out = np.ndarray(signal.shape, dtype=out_dtype, buffer=shm_out.buf).copy()
+        del x
+    finally:
+        for shm in (shm_in, shm_out):
+            shm.close()
+            shm.unlink()
+    return out
@@ -3,10 +3,14 @@ import numpy as np
 def spectral_subtraction(signal, noise_est, fs):
     N = len(signal)
     S = np.fft.rfft(signal)
-    N_est = np.fft.rfft(noise_est)
+    N_est = np.fft.rfft(noise_est, n=N)
+    return spectral_subtraction_from_spectrum(S, np.abs(N_est), N)
+
+def spectral_subtraction_from_spectrum(S, noise_mag, n):
+    # Subtract a precomputed noise magnitude from an existing rfft spectrum,
+    # so callers that already hold the spectrum don't transform again
     S_mag = np.abs(S)
-    N_mag = np.abs(N_est)
     S_phase = np.angle(S)
-    clean_mag = np.maximum(S_mag - N_mag, 0)
+    clean_mag = np.maximum(S_mag - noise_mag, 0)
     clean_S = clean_mag * np.exp(1j * S_phase)
-    return np.fft.irfft(clean_S, n=N) 
\ No newline at end of file
+    return np.fft.irfft(clean_S, n=n)
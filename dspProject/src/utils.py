@@ -1,3 +1,4 @@
+import struct
 import numpy as np
 import matplotlib.pyplot as plt
 import scipy.io.wavfile
@@ -30,8 +31,66 @@ def plot_signals(signals, labels, fs, title=None, window=None):
     plt.show()
 
 def load_wav(filename):
+    fs, data, _ = load_wav_with_gain(filename)
+    return fs, data
+
+def load_wav_with_gain(filename):
+    """
+    Load a WAV file like load_wav and also return the normalization gain.
+
+    load_wav scales each file so its loudest sample is 1.0. The gain maps
+    samples at full scale of their sample type (e.g. int16 / 32768) to the
+    normalized data: data = full_scale_samples * gain.
+
+    Returns:
+        tuple: (sample rate, normalized float32 data, gain)
+    """
     fs, data = scipy.io.wavfile.read(filename)
+    gain = 1.0
     # Normalize to float32 in [-1, 1] if needed
     if data.dtype != np.float32:
-        data = data.astype(np.float32) / np.max(np.abs(data))
-    return fs, data 
\ No newline at end of file
+        peak = float(np.max(np.abs(data)))
+        if np.issubdtype(data.dtype, np.integer):
+            full_scale = float(2 ** (8 * data.dtype.itemsize - 1))
+        else:
+            full_scale = 1.0
+        data = data.astype(np.float32) / peak
+        gain = full_scale / peak
+    return fs, data, gain
+
+def probe_wav(filename):
+    """
+    Read WAV metadata from the header only, without decoding samples.
+
+    Returns:
+        dict: 'sample_rate', 'channels', 'bits_per_sample', 'frames' and 'duration'
+    """
+    with open(filename, 'rb') as f:
+        riff, _, wave_id = struct.unpack('<4sI4s', f.read(12))
+        if riff not in (b'RIFF', b'RIFX') or wave_id != b'WAVE':
+            raise ValueError(f"{filename} is not a WAV file")
+        endian = '<' if riff == b'RIFF' else '>'
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f"{filename} has no data chunk")
+            chunk_id, chunk_size = struct.unpack(endian + '4sI', header)
+            if chunk_id == b'fmt ':
+                fmt = struct.unpack(endian + 'HHIIHH', f.read(16))
+                f.seek(chunk_size - 16 + (chunk_size & 1), 1)
+            elif chunk_id == b'data':
+                break
+            else:
+                f.seek(chunk_size + (chunk_size & 1), 1)
+    if fmt is None:
+        raise ValueError(f"{filename} has no fmt chunk")
+    _, channels, fs, _, block_align, bits = fmt
+    frames = chunk_size // block_align
+    return {
+        'sample_rate': fs,
+        'channels': channels,
+        'bits_per_sample': bits,
+        'frames': frames,
+        'duration': frames / fs,
+    }
@@ -1,9 +1,21 @@
 import pywt
 import numpy as np
 
-def wavelet_denoise(signal, wavelet='db8', level=4, threshold_factor=0.5):
+def wavelet_threshold(signal, wavelet='db8', threshold_factor=0.5):
+    # Universal threshold from the finest detail coefficients (the last entry
+    # of wavedec, i.e. a single-level dwt)
+    detail = pywt.dwt(signal, wavelet)[1]
+    sigma = np.median(np.abs(detail)) / 0.6745
+    return threshold_factor * sigma * np.sqrt(2 * np.log(len(signal)))
+
+def wavelet_denoise(signal, wavelet='db8', level=4, threshold_factor=0.5, threshold=None):
     coeffs = pywt.wavedec(signal, wavelet, level=level)
-    sigma = np.median(np.abs(coeffs[-1])) / 0.6745
-    uthresh = threshold_factor * sigma * np.sqrt(2 * np.log(len(signal)))
-    denoised_coeffs = [pywt.threshold(c, value=uthresh, mode='soft') for c in coeffs]
-    return pywt.waverec(denoised_coeffs, wavelet)[:len(signal)] 
\ No newline at end of file
+    if threshold is None:
+        sigma = np.median(np.abs(coeffs[-1])) / 0.6745
+        threshold = threshold_factor * sigma * np.sqrt(2 * np.log(len(signal)))
+    denoised_coeffs = [pywt.threshold(c, value=threshold, mode='soft') for c in coeffs]
+    return pywt.waverec(denoised_coeffs, wavelet)[:len(signal)]
+
+def wavelet_margin(wavelet='db8', level=4):
+    # Samples of context on each side that influence a reconstructed sample
+    return 2 * (pywt.Wavelet(wavelet).dec_len - 1) * 2 ** level